@@ -6,7 +6,7 @@
 # - Grid: 128 x 178
 # - Minimal UI (no visible HUD besides the Bookmark button)
 # - Top-left of puzzle aligned to top-left of canvas on start
-# - Puzzle state (edges + viewport) encoded into a URL-safe base64 token in the fragment (#state=...)
+# - Puzzle state (edges + viewport) LZ-string compressed into a URL-safe token in the fragment (#state=...)
 #
 # Usage:
 #   pip install streamlit
@@ -38,9 +38,20 @@ html_code = r"""
   }
   canvas {
     display:block;
-    background:#fff;   /* puzzle background */
+    position:absolute;
+    left:0;
+    top:0;
     touch-action:none;
   }
+  /* static dot grid, drawn with a margin so it can be slid around while panning */
+  #dotsCanvas {
+    background:#fff;   /* puzzle background */
+    pointer-events:none;
+  }
+  /* edges layer, transparent, stacked over the dots */
+  #mainCanvas {
+    background:transparent;
+  }
 
   /* Bookmark button */
   #bookmarkBtn {
@@ -62,6 +73,7 @@ html_code = r"""
 </head>
 <body>
 <div id="container">
+  <canvas id="dotsCanvas"></canvas>
   <canvas id="mainCanvas"></canvas>
 </div>
 
@@ -76,7 +88,9 @@ html_code = r"""
   const DOT_RADIUS = 1.0;
   const EDGE_HIT_RADIUS = 10;
   const INITIAL_ZOOM = 3.2;
+  const MIN_ZOOM = 0.6, MAX_ZOOM = 8;
   const BORDER = DOT_SPACING * 2; // margin so edges do not clip
+  const DOTS_MARGIN = 256; // px the dots layer extends past the view on each side
 
   const gridWidth  = (COLS - 1) * DOT_SPACING;
   const gridHeight = (ROWS - 1) * DOT_SPACING;
@@ -86,138 +100,459 @@ html_code = r"""
   // DOM
   const container = document.getElementById("container");
   const canvas = document.getElementById("mainCanvas");
-  const ctx = canvas.getContext("2d", { alpha:false });
+  const ctx = canvas.getContext("2d");
+  const dotsCanvas = document.getElementById("dotsCanvas");
+  const dctx = dotsCanvas.getContext("2d", { alpha:false });
   const bookmarkBtn = document.getElementById('bookmarkBtn');
 
   // State
+  let viewW = 0, viewH = 0; // canvas size in CSS px
+  let dpr = 1;              // backing-store pixels per CSS px
+  let dotsMargin = 0;       // DOTS_MARGIN in whole device px; the dots layer's CSS box derives from it
   let zoom = INITIAL_ZOOM;
   let viewport = { cx: null, cy: null, w: null, h: null }; // initialised on resize/load
+  // viewport the dots layer was last rasterised for (zoom null = needs redraw)
+  // originX/Y: rounded device-px offset of the world origin it was drawn at, as draw() rounds it
+  const dotsView = { cx: 0, cy: 0, zoom: null, originX: 0, originY: 0 };
 
-  // edges: Map keyed "i1,j1|i2,j2"
+  // edges: Map keyed by packed edge id (see ek) -> slot in the edge geometry arrays below
   const edges = new Map();
-  const degree = new Map();
+  const degree = new Uint8Array(COLS*ROWS); // edges touching each node, indexed by ni(x,y)
+
+  // edge geometry, one slot per edge (full-world units), kept dense: slots 0..eCount-1
+  const MAX_EDGES = COLS*(ROWS-1) + (COLS-1)*ROWS;
+  const eX0 = new Float32Array(MAX_EDGES), eY0 = new Float32Array(MAX_EDGES);
+  const eX1 = new Float32Array(MAX_EDGES), eY1 = new Float32Array(MAX_EDGES);
+  const slotKeys = new Int32Array(MAX_EDGES);
+  let eCount = 0;
+  let lastEdgeBits = null;   // cached packed edge bitset; null whenever edges change
+  let lastSaveHash = -1;     // fingerprint of the last saved state; -1 forces the next save
+  let edgesVersion = 0;      // bumped on every edge change, to spot saves that went stale
+  function markEdgesChanged(){
+    lastEdgeBits = null;
+    lastSaveHash = -1;
+    edgesVersion++;
+  }
 
-  const nodeKey = (x,y) => `${x},${y}`;
-  const edgeKey = (a,b) => {
-    const ka = nodeKey(a.x,a.y), kb = nodeKey(b.x,b.y);
-    return ka < kb ? ka + '|' + kb : kb + '|' + ka;
-  };
+  // coarse spatial index: each edge lives in the CELL x CELL block of its lower endpoint
+  const CELL = 16;
+  const BUCKET_COLS = Math.ceil(COLS/CELL), BUCKET_ROWS = Math.ceil(ROWS/CELL);
+  const buckets = [];
+  for (let b = 0; b < BUCKET_COLS*BUCKET_ROWS; b++) buckets.push([]);
+  const slotBucket = new Int32Array(MAX_EDGES);    // bucket holding slot i
+  const slotBucketPos = new Int32Array(MAX_EDGES); // index of slot i within that bucket
+  // per-bucket Path2D of its edges in full-world coords; null = rebuild on next draw
+  const bucketPaths = new Array(buckets.length).fill(null);
+
+  const ni = (x,y) => x*ROWS + y;
+  // integer edge key: endpoints ordered so (a,b) and (b,a) agree; always < 2^31
+  function ek(ax,ay,bx,by){
+    if (ax > bx || (ax === bx && ay > by)){ const tx = ax, ty = ay; ax = bx; ay = by; bx = tx; by = ty; }
+    return ((ax*ROWS + ay)*COLS + bx)*ROWS + by;
+  }
 
-  function addEdge(a,b){
-    const k = edgeKey(a,b);
+  // dense id over every possible unit edge: horizontal edges first, then vertical; -1 if not a unit edge
+  const H_EDGES = (COLS-1)*ROWS;
+  function edgeId(ax,ay,bx,by){
+    if (ay === by && Math.abs(ax - bx) === 1) return ay*(COLS-1) + Math.min(ax,bx);
+    if (ax === bx && Math.abs(ay - by) === 1) return H_EDGES + Math.min(ay,by)*COLS + ax;
+    return -1;
+  }
+
+  function insertEdgeSlot(k,ax,ay,bx,by){
+    const i = eCount++;
+    eX0[i] = BORDER + ax*DOT_SPACING; eY0[i] = BORDER + ay*DOT_SPACING;
+    eX1[i] = BORDER + bx*DOT_SPACING; eY1[i] = BORDER + by*DOT_SPACING;
+    slotKeys[i] = k;
+    edges.set(k,i);
+    markEdgesChanged();
+    const b = ((Math.min(ay,by)/CELL)|0)*BUCKET_COLS + ((Math.min(ax,bx)/CELL)|0);
+    slotBucket[i] = b;
+    bucketPaths[b] = null;
+    slotBucketPos[i] = buckets[b].length;
+    buckets[b].push(i);
+  }
+  function deleteEdgeSlot(k){
+    const i = edges.get(k), last = --eCount;
+    edges.delete(k);
+    markEdgesChanged();
+    const bucket = buckets[slotBucket[i]], pos = slotBucketPos[i];
+    bucketPaths[slotBucket[i]] = null;
+    const moved = bucket.pop();
+    if (moved !== i){ bucket[pos] = moved; slotBucketPos[moved] = pos; }
+    if (i !== last){
+      // swap-with-last keeps the arrays dense
+      eX0[i] = eX0[last]; eY0[i] = eY0[last];
+      eX1[i] = eX1[last]; eY1[i] = eY1[last];
+      slotKeys[i] = slotKeys[last];
+      edges.set(slotKeys[i], i);
+      slotBucket[i] = slotBucket[last];
+      slotBucketPos[i] = slotBucketPos[last];
+      buckets[slotBucket[i]][slotBucketPos[i]] = i;
+    }
+  }
+  // grid coords of the edge in slot i, as [ax,ay,bx,by]
+  const slotGrid = (i) => [
+    (eX0[i]-BORDER)/DOT_SPACING, (eY0[i]-BORDER)/DOT_SPACING,
+    (eX1[i]-BORDER)/DOT_SPACING, (eY1[i]-BORDER)/DOT_SPACING
+  ];
+
+  function addEdge(ax,ay,bx,by){
+    const k = ek(ax,ay,bx,by);
     if (edges.has(k)) return false;
-    const da = degree.get(nodeKey(a.x,a.y))||0;
-    const db = degree.get(nodeKey(b.x,b.y))||0;
+    const da = degree[ni(ax,ay)];
+    const db = degree[ni(bx,by)];
     if (da >= 2 || db >= 2) return false;
-    edges.set(k,true);
-    degree.set(nodeKey(a.x,a.y), da+1);
-    degree.set(nodeKey(b.x,b.y), db+1);
+    insertEdgeSlot(k,ax,ay,bx,by);
+    degree[ni(ax,ay)] = da+1;
+    degree[ni(bx,by)] = db+1;
     scheduleSaveState(); // persist change to URL fragment (iframe-level)
     return true;
   }
-  function removeEdge(a,b){
-    const k = edgeKey(a,b);
+  function removeEdge(ax,ay,bx,by){
+    const k = ek(ax,ay,bx,by);
     if (!edges.has(k)) return false;
-    edges.delete(k);
-    degree.set(nodeKey(a.x,a.y), (degree.get(nodeKey(a.x,a.y))||1)-1);
-    degree.set(nodeKey(b.x,b.y), (degree.get(nodeKey(b.x,b.y))||1)-1);
+    deleteEdgeSlot(k);
+    degree[ni(ax,ay)]--;
+    degree[ni(bx,by)]--;
     scheduleSaveState();
     return true;
   }
 
-  function fullToScreen(x,y){
-    const l = viewport.cx - viewport.w/2;
-    const t = viewport.cy - viewport.h/2;
-    return {
-      x: (x - l) / viewport.w * canvas.width,
-      y: (y - t) / viewport.h * canvas.height
-    };
-  }
   function screenToFull(sx, sy){
     const l = viewport.cx - viewport.w/2;
     const t = viewport.cy - viewport.h/2;
     return {
-      x: l + sx / canvas.width * viewport.w,
-      y: t + sy / canvas.height * viewport.h
+      x: l + sx / viewW * viewport.w,
+      y: t + sy / viewH * viewport.h
     };
   }
 
   function resizeCanvas(){
-    canvas.width = container.clientWidth;
-    canvas.height = container.clientHeight;
-    viewport.w = canvas.width / zoom;
-    viewport.h = canvas.height / zoom;
+    // backing stores at device resolution (capped at 2x); layout and viewport math stay in CSS px
+    dpr = Math.min(window.devicePixelRatio || 1, 2);
+    viewW = container.clientWidth;
+    viewH = container.clientHeight;
+    canvas.style.width = viewW + "px";
+    canvas.style.height = viewH + "px";
+    canvas.width = viewW*dpr|0;
+    canvas.height = viewH*dpr|0;
+    // sized and placed in whole device px, so the compositor never resamples the dots
+    dotsMargin = Math.round(DOTS_MARGIN*dpr);
+    dotsCanvas.width = canvas.width + dotsMargin*2;
+    dotsCanvas.height = canvas.height + dotsMargin*2;
+    dotsCanvas.style.width = dotsCanvas.width/dpr + "px";
+    dotsCanvas.style.height = dotsCanvas.height/dpr + "px";
+    dotsCanvas.style.left = -dotsMargin/dpr + "px";
+    dotsCanvas.style.top = -dotsMargin/dpr + "px";
+    dotsView.zoom = null;
+    viewport.w = viewW / zoom;
+    viewport.h = viewH / zoom;
     if (viewport.cx === null) viewport.cx = viewport.w/2;
     if (viewport.cy === null) viewport.cy = viewport.h/2;
   }
 
-  function draw(){
-    ctx.fillStyle = "#fff";
-    ctx.fillRect(0,0,canvas.width,canvas.height);
+  // single prerendered dot, blitted once per grid point; rebuilt when the radius changes
+  const dotSprite = { canvas: null, radius: 0, half: 0 };
+  function getDotSprite(r){
+    if (dotSprite.canvas && dotSprite.radius === r) return dotSprite;
+    const size = 2*Math.ceil(r) + 2; // even, so the dot centre sits on a whole pixel
+    let c;
+    if (typeof OffscreenCanvas === "function") c = new OffscreenCanvas(size, size);
+    else { c = document.createElement("canvas"); c.width = size; c.height = size; }
+    const sctx = c.getContext("2d");
+    sctx.fillStyle = "#000";
+    sctx.beginPath();
+    sctx.arc(size/2, size/2, r, 0, Math.PI*2);
+    sctx.fill();
+    dotSprite.canvas = c;
+    dotSprite.radius = r;
+    dotSprite.half = size/2;
+    return dotSprite;
+  }
 
-    // visible bounds
-    const left = viewport.cx - viewport.w/2;
-    const top  = viewport.cy - viewport.h/2;
-    const right = left + viewport.w;
-    const bottom = top + viewport.h;
-    const minI = Math.max(0, Math.floor((left - BORDER) / DOT_SPACING) - 1);
-    const maxI = Math.min(COLS-1, Math.ceil((right - BORDER) / DOT_SPACING) + 1);
-    const minJ = Math.max(0, Math.floor((top - BORDER) / DOT_SPACING) - 1);
-    const maxJ = Math.min(ROWS-1, Math.ceil((bottom - BORDER) / DOT_SPACING) + 1);
-
-    // dots (black)
-    ctx.fillStyle = "#000";
-    const r = Math.max(0.6, DOT_RADIUS * zoom/2);
+  // Grid nodes within marginPx screen px of the view, clamped to the board. The one
+  // place visibility is decided; margins are CSS px so HiDPI backing stores don't widen them.
+  const CULL_MARGIN = 64; // px of slack for line width and round caps
+  const dotsRange = { minI: 0, maxI: 0, minJ: 0, maxJ: 0 };
+  const edgesRange = { minI: 0, maxI: 0, minJ: 0, maxJ: 0 };
+  function visibleNodeRange(marginPx, out){
+    const m = marginPx * viewport.w / viewW; // margin in full-world units
+    const left = viewport.cx - viewport.w/2 - m;
+    const top  = viewport.cy - viewport.h/2 - m;
+    out.minI = Math.max(0, Math.floor((left - BORDER) / DOT_SPACING));
+    out.maxI = Math.min(COLS-1, Math.ceil((left + viewport.w + 2*m - BORDER) / DOT_SPACING));
+    out.minJ = Math.max(0, Math.floor((top - BORDER) / DOT_SPACING));
+    out.maxJ = Math.min(ROWS-1, Math.ceil((top + viewport.h + 2*m - BORDER) / DOT_SPACING));
+    return out;
+  }
+
+  // Rasterise the dot grid for the current viewport, DOTS_MARGIN px beyond it on each side
+  function drawDots(){
+    dotsCanvas.style.transform = "";
+    dotsView.cx = viewport.cx;
+    dotsView.cy = viewport.cy;
+    dotsView.zoom = zoom;
+    dctx.setTransform(1,0,0,1,0,0);
+    dctx.fillStyle = "#fff";
+    dctx.fillRect(0,0,dotsCanvas.width,dotsCanvas.height);
+
+    // dots (black): sprite blits in full-world coords under one world->device transform;
+    // the sprite is sized so each blit is 1:1, and nearest-neighbour sampling keeps it crisp
+    const sprite = getDotSprite(Math.max(0.6, DOT_RADIUS * zoom/2) * dpr);
+    const { minI, maxI, minJ, maxJ } = visibleNodeRange(DOTS_MARGIN + sprite.half/dpr, dotsRange);
+    const s = viewW / viewport.w * dpr;
+    const left = viewport.cx - viewport.w/2, top = viewport.cy - viewport.h/2;
+    dotsView.originX = Math.round(-left*s);
+    dotsView.originY = Math.round(-top*s);
+    dctx.setTransform(s, 0, 0, s, dotsMargin + dotsView.originX, dotsMargin + dotsView.originY);
+    dctx.imageSmoothingEnabled = false;
+    const rw = sprite.half / s, dw = 2*rw;
     for (let j = minJ; j <= maxJ; j++){
+      const fy = BORDER + j * DOT_SPACING - rw;
       for (let i = minI; i <= maxI; i++){
-        const fx = BORDER + i * DOT_SPACING;
-        const fy = BORDER + j * DOT_SPACING;
-        const p = fullToScreen(fx, fy);
-        if (p.x < -4 || p.x > canvas.width + 4 || p.y < -4 || p.y > canvas.height + 4) continue;
-        ctx.beginPath();
-        ctx.arc(p.x, p.y, r, 0, Math.PI*2);
-        ctx.fill();
+        dctx.drawImage(sprite.canvas, BORDER + i * DOT_SPACING - rw, fy, dw, dw);
       }
     }
+    dctx.setTransform(1,0,0,1,0,0);
+  }
+
+  // Slide the dots layer to follow a pan; re-rasterise on zoom or once the margin runs out
+  function syncDots(){
+    // shift by the change in the origin draw() rounds, so the layer lands where a fresh raster would
+    const s = viewW / viewport.w * dpr;
+    const dx = (Math.round(-(viewport.cx - viewport.w/2)*s) - dotsView.originX) / dpr;
+    const dy = (Math.round(-(viewport.cy - viewport.h/2)*s) - dotsView.originY) / dpr;
+    if (dotsView.zoom !== zoom || Math.abs(dx)*dpr > dotsMargin || Math.abs(dy)*dpr > dotsMargin){
+      drawDots();
+      return;
+    }
+    dotsCanvas.style.transform = `translate(${dx}px, ${dy}px)`;
+  }
+
+  function buildBucketPath(b){
+    const bucket = buckets[b];
+    const path = new Path2D();
+    for (let n = 0; n < bucket.length; n++){
+      const i = bucket[n];
+      path.moveTo(eX0[i], eY0[i]);
+      path.lineTo(eX1[i], eY1[i]);
+    }
+    bucketPaths[b] = path;
+    return path;
+  }
+
+  function draw(){
+    syncDots();
+    ctx.clearRect(0,0,canvas.width,canvas.height); // identity transform: device px
+
+    const left = viewport.cx - viewport.w/2;
+    const top  = viewport.cy - viewport.h/2;
+    const { minI, maxI, minJ, maxJ } = visibleNodeRange(CULL_MARGIN, edgesRange);
 
-    // edges (grey)
+    // edges (grey): cached world-space paths, mapped to the screen by one transform
+    const s = viewW / viewport.w * dpr; // full-world units -> device px
+    const lw = Math.round((Math.max(3, zoom * 1.1)|0) * dpr);
+    // same whole-pixel origin as the dots layer, so edges and dots stay aligned
+    ctx.setTransform(s, 0, 0, s, Math.round(-left*s), Math.round(-top*s));
     ctx.strokeStyle = "#888";
-    ctx.lineWidth = Math.max(3, zoom * 1.1);
+    ctx.lineWidth = lw / s;
     ctx.lineCap = "round";
-    ctx.beginPath();
-    edges.forEach((_, k) => {
-      const [a,b] = k.split("|").map(s => s.split(",").map(Number));
-      const p1 = fullToScreen(BORDER + a[0]*DOT_SPACING, BORDER + a[1]*DOT_SPACING);
-      const p2 = fullToScreen(BORDER + b[0]*DOT_SPACING, BORDER + b[1]*DOT_SPACING);
-      ctx.moveTo(p1.x, p1.y);
-      ctx.lineTo(p2.x, p2.y);
+    // only buckets holding the visible range; edges hanging off its low side start
+    // outside the culling margin, so no extra bucket of slack is needed
+    const bMinI = (minI/CELL)|0, bMaxI = (maxI/CELL)|0;
+    const bMinJ = (minJ/CELL)|0, bMaxJ = (maxJ/CELL)|0;
+    for (let bj = bMinJ; bj <= bMaxJ; bj++){
+      for (let bi = bMinI; bi <= bMaxI; bi++){
+        const b = bj*BUCKET_COLS + bi;
+        if (buckets[b].length === 0) continue;
+        ctx.stroke(bucketPaths[b] || buildBucketPath(b));
+      }
+    }
+    ctx.setTransform(1,0,0,1,0,0);
+  }
+
+  // Coalesce redraw requests into at most one draw() per animation frame
+  let rafPending = false;
+  function requestDraw(){
+    if (rafPending) return;
+    rafPending = true;
+    requestAnimationFrame(() => {
+      rafPending = false;
+      draw();
     });
-    ctx.stroke();
   }
 
-  // Robust UTF-8 safe base64 URL-safe encode/decode using TextEncoder/TextDecoder
-  function encodeStateToString(stateObj){
+  // bytes <-> latin1 "binary" strings for btoa/atob; encoded 8 KB at a time rather than per byte
+  const BINARY_CHUNK = 0x2000;
+  function bytesToBinary(bytes){
+    const parts = [];
+    for (let i = 0; i < bytes.length; i += BINARY_CHUNK){
+      parts.push(String.fromCharCode.apply(null, bytes.subarray(i, i + BINARY_CHUNK)));
+    }
+    return parts.join('');
+  }
+  function binaryToBytes(binary){
+    const len = binary.length;
+    const bytes = new Uint8Array(len);
+    for (let i = 0; i < len; i++) bytes[i] = binary.charCodeAt(i);
+    return bytes;
+  }
+  function base64UrlToBytes(s){
+    s = s.replace(/-/g,'+').replace(/_/g,'/');
+    while (s.length % 4 !== 0) s += '=';
+    return binaryToBytes(atob(s));
+  }
+
+  // LZ-string, compressToEncodedURIComponent / decompressFromEncodedURIComponent only
+  // (same bitstream as pieroxy/lz-string 1.4, MIT). Output alphabet is URL-safe as-is.
+  function lzStringFactory(){
+    const KEY = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+-$";
+    const KEY_INDEX = {};
+    for (let i = 0; i < KEY.length; i++) KEY_INDEX[KEY.charAt(i)] = i;
+    const BITS = 6;
+
+    function compress(input){
+      if (input == null) return "";
+      const dict = new Map();      // phrase -> code
+      const pending = new Set();   // single chars not yet emitted literally
+      const out = [];
+      let w = "", enlargeIn = 2, dictSize = 3, numBits = 2;
+      let val = 0, pos = 0;
+      const writeBits = (n, value) => {
+        for (let i = 0; i < n; i++){
+          val = (val << 1) | (value & 1);
+          if (pos === BITS - 1){ pos = 0; out.push(KEY.charAt(val)); val = 0; }
+          else pos++;
+          value >>= 1;
+        }
+      };
+      const grow = () => {
+        if (--enlargeIn === 0){ enlargeIn = Math.pow(2, numBits); numBits++; }
+      };
+      const emit = (phrase) => {
+        if (pending.has(phrase)){
+          const code = phrase.charCodeAt(0);
+          if (code < 256){ writeBits(numBits, 0); writeBits(8, code); }
+          else { writeBits(numBits, 1); writeBits(16, code); }
+          grow();
+          pending.delete(phrase);
+        } else {
+          writeBits(numBits, dict.get(phrase));
+        }
+        grow();
+      };
+      for (let ii = 0; ii < input.length; ii++){
+        const c = input.charAt(ii);
+        if (!dict.has(c)){ dict.set(c, dictSize++); pending.add(c); }
+        const wc = w + c;
+        if (dict.has(wc)){ w = wc; continue; }
+        emit(w);
+        dict.set(wc, dictSize++);
+        w = c;
+      }
+      if (w !== "") emit(w);
+      writeBits(numBits, 2); // end of stream
+      for (;;){
+        val <<= 1;
+        if (pos === BITS - 1){ out.push(KEY.charAt(val)); break; }
+        pos++;
+      }
+      return out.join('');
+    }
+
+    // returns the decompressed string, "" for a truncated stream, null for a corrupt one
+    function decompress(input){
+      if (input == null) return "";
+      if (input === "") return null;
+      input = input.replace(/ /g, "+");
+      const length = input.length, reset = 1 << (BITS - 1);
+      const next = (i) => KEY_INDEX[input.charAt(i)] | 0;
+      const dict = [0, 1, 2];
+      const result = [];
+      let enlargeIn = 4, dictSize = 4, numBits = 3;
+      let val = next(0), pos = reset, index = 1;
+      const readBits = (n) => {
+        let bits = 0;
+        for (let power = 1, i = 0; i < n; i++, power <<= 1){
+          const b = val & pos;
+          pos >>= 1;
+          if (pos === 0){ pos = reset; val = next(index++); }
+          if (b) bits |= power;
+        }
+        return bits;
+      };
+      let c;
+      switch (readBits(2)){
+        case 0: c = String.fromCharCode(readBits(8)); break;
+        case 1: c = String.fromCharCode(readBits(16)); break;
+        default: return "";
+      }
+      dict[3] = c;
+      let w = c;
+      result.push(c);
+      for (;;){
+        if (index > length) return "";
+        let code = readBits(numBits);
+        if (code === 0 || code === 1){
+          dict[dictSize++] = String.fromCharCode(readBits(code === 0 ? 8 : 16));
+          code = dictSize - 1;
+          enlargeIn--;
+        } else if (code === 2){
+          return result.join('');
+        }
+        if (enlargeIn === 0){ enlargeIn = Math.pow(2, numBits); numBits++; }
+        let entry;
+        if (code < dictSize && dict[code] !== undefined) entry = dict[code];
+        else if (code === dictSize) entry = w + w.charAt(0);
+        else return null;
+        result.push(entry);
+        dict[dictSize++] = w + entry.charAt(0);
+        enlargeIn--;
+        w = entry;
+        if (enlargeIn === 0){ enlargeIn = Math.pow(2, numBits); numBits++; }
+      }
+    }
+
+    return { compressToEncodedURIComponent: compress, decompressFromEncodedURIComponent: decompress };
+  }
+  const LZString = lzStringFactory();
+
+  // Binary state: STATE_MAGIC, viewport cx/cy/zoom as little-endian f32, then the edge bitset
+  const STATE_MAGIC = 0xB1; // never the first char of a JSON payload
+  const STATE_HEADER = 13;
+  function encodeStateHeader(){
+    const bytes = new Uint8Array(STATE_HEADER);
+    const dv = new DataView(bytes.buffer);
+    bytes[0] = STATE_MAGIC;
+    dv.setFloat32(1, viewport.cx, true);
+    dv.setFloat32(5, viewport.cy, true);
+    dv.setFloat32(9, zoom, true);
+    return bytes;
+  }
+
+  // State token: LZ-string of the binary state string, already URL-safe
+  function encodeStateToString(binary){
     try {
-      const json = JSON.stringify(stateObj);
-      const encoder = new TextEncoder();
-      const bytes = encoder.encode(json);
-      let binary = "";
-      for (let i = 0; i < bytes.length; i++) binary += String.fromCharCode(bytes[i]);
-      let b64 = btoa(binary);
-      b64 = b64.replace(/\+/g,'-').replace(/\//g,'_').replace(/=+$/,'');
-      return b64;
+      return LZString.compressToEncodedURIComponent(binary);
     } catch(e) {
       return "";
     }
   }
+  // Returns a Uint8Array for binary tokens, a parsed object for legacy JSON tokens, or null
   function decodeStateFromString(s){
     try {
-      s = s.replace(/-/g,'+').replace(/_/g,'/');
-      while (s.length % 4 !== 0) s += '=';
-      const binary = atob(s);
-      const len = binary.length;
-      const bytes = new Uint8Array(len);
-      for (let i = 0; i < len; i++) bytes[i] = binary.charCodeAt(i);
+      const str = LZString.decompressFromEncodedURIComponent(s);
+      if (str && str.charCodeAt(0) === STATE_MAGIC) return binaryToBytes(str);
+    } catch(e) {
+      // not an LZ token; fall through to the legacy format
+    }
+    return decodeLegacyStateFromString(s);
+  }
+  // Legacy tokens: URL-safe base64 of UTF-8 JSON
+  function decodeLegacyStateFromString(s){
+    try {
+      const bytes = base64UrlToBytes(s);
       const decoder = new TextDecoder();
       const json = decoder.decode(bytes);
       return JSON.parse(json);
@@ -238,73 +573,225 @@ html_code = r"""
     return null;
   }
 
-  // Apply state (edges array and optional viewport)
+  // Edge bitset: bit edgeId(...) set for every present edge
+  function packEdgeBits(){
+    const bits = new Uint8Array(Math.ceil(MAX_EDGES/8));
+    for (let i = 0; i < eCount; i++){
+      const id = edgeId(
+        (eX0[i]-BORDER)/DOT_SPACING, (eY0[i]-BORDER)/DOT_SPACING,
+        (eX1[i]-BORDER)/DOT_SPACING, (eY1[i]-BORDER)/DOT_SPACING);
+      if (id >= 0) bits[id >> 3] |= 1 << (id & 7);
+    }
+    return bits;
+  }
+
+  // Edges from this app's own tokens: unique, on-grid and within the degree limit already
+  function loadTrustedEdge(ax,ay,bx,by){
+    insertEdgeSlot(ek(ax,ay,bx,by),ax,ay,bx,by);
+    degree[ni(ax,ay)]++;
+    degree[ni(bx,by)]++;
+  }
+  // Edges from anywhere else get the same checks as addEdge, plus range checks
+  const onGrid = (x,y) => Number.isInteger(x) && Number.isInteger(y) && x >= 0 && x < COLS && y >= 0 && y < ROWS;
+  function loadCheckedEdge(ax,ay,bx,by){
+    if (!onGrid(ax,ay) || !onGrid(bx,by) || edgeId(ax,ay,bx,by) < 0) return;
+    if (edges.has(ek(ax,ay,bx,by))) return;
+    if (degree[ni(ax,ay)] >= 2 || degree[ni(bx,by)] >= 2) return;
+    loadTrustedEdge(ax,ay,bx,by);
+  }
+
+  // Load every edge whose bit is set in bits[offset..]
+  function loadEdgeBits(bits, offset, load){
+    const n = Math.min(bits.length - offset, Math.ceil(MAX_EDGES/8));
+    for (let byte = 0; byte < n; byte++){
+      let v = bits[offset + byte];
+      while (v){
+        const low = v & -v;
+        v ^= low;
+        const id = byte*8 + 31 - Math.clz32(low);
+        let ax, ay, bx, by;
+        if (id < H_EDGES){
+          ay = by = (id / (COLS-1))|0; ax = id - ay*(COLS-1); bx = ax + 1;
+        } else if (id < MAX_EDGES){
+          const v2 = id - H_EDGES;
+          ay = (v2 / COLS)|0; ax = bx = v2 - ay*COLS; by = ay + 1;
+        } else continue;
+        load(ax,ay,bx,by);
+      }
+    }
+  }
+
+  function clearEdges(){
+    edges.clear();
+    degree.fill(0);
+    eCount = 0;
+    markEdgesChanged();
+    for (const bucket of buckets) bucket.length = 0;
+    bucketPaths.fill(null);
+  }
+
+  function applyViewport(v){
+    if (typeof v.zoom === "number" && isFinite(v.zoom)) zoom = Math.max(MIN_ZOOM, Math.min(MAX_ZOOM, v.zoom));
+    if (typeof v.cx === "number" && isFinite(v.cx)) viewport.cx = v.cx;
+    if (typeof v.cy === "number" && isFinite(v.cy)) viewport.cy = v.cy;
+    viewport.w = viewW / zoom;
+    viewport.h = viewH / zoom;
+    viewport.cx = Math.max(viewport.w/2, Math.min(fullWidth - viewport.w/2, viewport.cx));
+    viewport.cy = Math.max(viewport.h/2, Math.min(fullHeight - viewport.h/2, viewport.cy));
+  }
+
+  // Apply a binary state (see encodeStateHeader); false if the header is missing
+  function applyBinaryState(bytes){
+    if (bytes.length < STATE_HEADER || bytes[0] !== STATE_MAGIC) return false;
+    const dv = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+    clearEdges();
+    loadEdgeBits(bytes, STATE_HEADER, loadTrustedEdge);
+    applyViewport({ cx: dv.getFloat32(1, true), cy: dv.getFloat32(5, true), zoom: dv.getFloat32(9, true) });
+    return true;
+  }
+
+  // Apply state (edges array and optional viewport); edges are validated like user clicks
   function applyState(obj){
     if (!obj) return;
-    edges.clear();
-    degree.clear();
+    clearEdges();
     if (Array.isArray(obj.edges)){
       for (const e of obj.edges){
         if (!Array.isArray(e) || e.length < 4) continue;
-        const a = { x: e[0], y: e[1] }, b = { x: e[2], y: e[3] };
-        const k = edgeKey(a,b);
-        edges.set(k,true);
-        degree.set(nodeKey(a.x,a.y), (degree.get(nodeKey(a.x,a.y))||0)+1);
-        degree.set(nodeKey(b.x,b.y), (degree.get(nodeKey(b.x,b.y))||0)+1);
+        loadCheckedEdge(e[0], e[1], e[2], e[3]);
       }
     }
-    if (obj.viewport && typeof obj.viewport === "object"){
-      if (typeof obj.viewport.zoom === "number" && obj.viewport.zoom > 0) zoom = obj.viewport.zoom;
-      if (typeof obj.viewport.cx === "number") viewport.cx = obj.viewport.cx;
-      if (typeof obj.viewport.cy === "number") viewport.cy = obj.viewport.cy;
-      viewport.w = canvas.width / zoom;
-      viewport.h = canvas.height / zoom;
-      viewport.cx = Math.max(viewport.w/2, Math.min(fullWidth - viewport.w/2, viewport.cx));
-      viewport.cy = Math.max(viewport.h/2, Math.min(fullHeight - viewport.h/2, viewport.cy));
-    }
+    if (obj.viewport && typeof obj.viewport === "object") applyViewport(obj.viewport);
   }
 
   // Save state into URL fragment (debounced) - writes into iframe's URL fragment
+  // Viewport-only saves ({edges:false}) never postpone a pending edge save, which
+  // picks up the latest viewport anyway.
   let saveTimer = null;
-  function scheduleSaveState(delay = 500){
+  let saveTimerForEdges = false;
+  function scheduleSaveState(delay = 500, { edges: edgesChanged = true } = {}){
+    if (saveTimer && saveTimerForEdges && !edgesChanged) return;
     if (saveTimer) clearTimeout(saveTimer);
+    saveTimerForEdges = edgesChanged;
     saveTimer = setTimeout(() => {
       saveTimer = null;
+      saveTimerForEdges = false;
       saveStateToURL();
     }, delay);
   }
-  function saveStateToURL(){
-    const edgesArr = [];
-    edges.forEach((_, k) => {
-      const [a,b] = k.split("|");
-      const aa = a.split(",").map(Number), bb = b.split(",").map(Number);
-      edgesArr.push([aa[0], aa[1], bb[0], bb[1]]);
+  // Edge bitset over all possible edges (fixed ~5.7 KB), repacked only after edge changes
+  function getEdgeBits(){
+    if (lastEdgeBits === null) lastEdgeBits = packEdgeBits();
+    return lastEdgeBits;
+  }
+
+  // Off-main-thread encoder: the worker runs bytesToBinary + LZ-string on posted header and
+  // bitset buffers. Built from this file's own functions; any failure drops back to
+  // encoding synchronously on the main thread.
+  const stateWorkerSrc = `
+const BINARY_CHUNK = ${BINARY_CHUNK};
+${bytesToBinary.toString()}
+${lzStringFactory.toString()}
+const LZString = lzStringFactory();
+onmessage = (ev) => {
+  const { id, header, bits } = ev.data;
+  let token = "";
+  try {
+    token = LZString.compressToEncodedURIComponent(bytesToBinary(new Uint8Array(header)) + bytesToBinary(new Uint8Array(bits)));
+  } catch(e) {}
+  postMessage({ id, token });
+};`;
+  let stateWorker = null;
+  let workerSeq = 0;
+  const workerPending = new Map(); // id -> { resolve, header, bits }
+  try {
+    if (typeof Worker === "function"){
+      const workerUrl = URL.createObjectURL(new Blob([stateWorkerSrc], { type: "text/javascript" }));
+      stateWorker = new Worker(workerUrl);
+      URL.revokeObjectURL(workerUrl); // the worker has already resolved its script URL
+      stateWorker.onmessage = (ev) => {
+        const job = workerPending.get(ev.data.id);
+        if (!job) return;
+        workerPending.delete(ev.data.id);
+        job.resolve(ev.data.token);
+      };
+      stateWorker.onerror = () => {
+        stateWorker = null;
+        workerPending.forEach(job => job.resolve(encodeStateToString(bytesToBinary(job.header) + bytesToBinary(job.bits))));
+        workerPending.clear();
+      };
+    }
+  } catch(e) {
+    stateWorker = null;
+  }
+
+  function encodeStateSync(){
+    return encodeStateToString(bytesToBinary(encodeStateHeader()) + bytesToBinary(getEdgeBits()));
+  }
+  // Resolves to the state token for the current edges + viewport
+  function encodeStateAsync(){
+    if (!stateWorker) return Promise.resolve(encodeStateSync());
+    const header = encodeStateHeader(), bits = getEdgeBits();
+    const id = ++workerSeq;
+    return new Promise((resolve) => {
+      workerPending.set(id, { resolve, header, bits });
+      // transfer copies; the cached bitset stays usable on this side
+      const headerCopy = header.slice(), bitsCopy = bits.slice();
+      stateWorker.postMessage({ id, header: headerCopy.buffer, bits: bitsCopy.buffer }, [headerCopy.buffer, bitsCopy.buffer]);
     });
-    const stateObj = {
-      edges: edgesArr,
-      viewport: { cx: viewport.cx, cy: viewport.cy, zoom: zoom }
-    };
-    const token = encodeStateToString(stateObj);
-    if (!token) return;
+  }
+  // Viewport-only writes to session history are throttled to one per REPLACE_INTERVAL ms;
+  // edge changes and forced saves (pointer release, page hide) always go through.
+  const REPLACE_INTERVAL = 1500;
+  let lastReplace = -Infinity;
+  // `sync` encodes on this thread, for page-hide paths where a worker reply may never arrive.
+  let saveSeq = 0;
+  async function saveStateToURL({ force = false, sync = false } = {}){
+    // edges are covered by markEdgesChanged(); sub-unit viewport nudges don't count as a change
+    const h = (Math.imul(eCount, 0x9E3779B1) ^ Math.imul(viewport.cx|0, 0x85EBCA77) ^
+               Math.imul(viewport.cy|0, 0xC2B2AE3D) ^ ((zoom*1000)|0)) >>> 0;
+    if (h === lastSaveHash) return;
+    const edgesPending = lastSaveHash === -1;
+    const sinceReplace = performance.now() - lastReplace;
+    if (!force && !edgesPending && sinceReplace < REPLACE_INTERVAL){
+      scheduleSaveState(REPLACE_INTERVAL - sinceReplace, { edges: false });
+      return;
+    }
+    const seq = ++saveSeq, version = edgesVersion;
+    const token = sync ? encodeStateSync() : await encodeStateAsync();
+    if (!token || seq !== saveSeq) return; // failed, or a newer save superseded this one
+    // if edges changed mid-encode, the save they scheduled must not be skipped
+    if (version === edgesVersion) lastSaveHash = h;
     const newHash = "#state=" + token;
+    if (newHash === window.location.hash) return;
     // this changes the iframe fragment (useful for restore within iframe)
     history.replaceState(null, "", window.location.pathname + window.location.search + newHash);
+    lastReplace = performance.now();
   }
 
   // Try to restore on load
   function tryRestoreFromURL(){
     const obj = loadStateFromURL();
     if (!obj) return false;
-    applyState(obj);
-    return true;
+    try {
+      if (obj instanceof Uint8Array) return applyBinaryState(obj);
+      applyState(obj);
+      return true;
+    } catch(e) {
+      // a malformed token must never keep the app from starting; fall back to an empty board
+      clearEdges();
+      return false;
+    }
   }
 
-  // Find nearest edge (search neighborhood)
+  // Find nearest edge (search neighborhood). Fills and returns one shared record, so
+  // callers must read it before the next call.
+  const nearestEdge = { d2: Infinity, ax: 0, ay: 0, bx: 0, by: 0 };
   function findNearestEdgeToFull(fullX, fullY){
     const gx = (fullX - BORDER) / DOT_SPACING;
     const gy = (fullY - BORDER) / DOT_SPACING;
     const ix = Math.round(gx), iy = Math.round(gy);
-    let best = { dist: Infinity, a: null, b: null };
+    const best = nearestEdge;
+    best.d2 = Infinity;
     for (let dx=-2; dx<=2; dx++){
       for (let dy=-2; dy<=2; dy++){
         const nx = ix+dx, ny = iy+dy;
@@ -313,14 +800,14 @@ html_code = r"""
           const bx = BORDER + (nx+1)*DOT_SPACING, by = BORDER + ny*DOT_SPACING;
           const mx = 0.5*(ax+bx), my = 0.5*(ay+by);
           const d2 = (mx-fullX)*(mx-fullX) + (my-fullY)*(my-fullY);
-          if (d2 < best.dist){ best = { dist:d2, a:{x:nx,y:ny}, b:{x:nx+1,y:ny} }; }
+          if (d2 < best.d2){ best.d2 = d2; best.ax = nx; best.ay = ny; best.bx = nx+1; best.by = ny; }
         }
         if (nx >= 0 && nx < COLS && ny >=0 && ny+1 < ROWS){
           const ax = BORDER + nx*DOT_SPACING, ay = BORDER + ny*DOT_SPACING;
           const bx = BORDER + nx*DOT_SPACING, by = BORDER + (ny+1)*DOT_SPACING;
           const mx = 0.5*(ax+bx), my = 0.5*(ay+by);
           const d2 = (mx-fullX)*(mx-fullX) + (my-fullY)*(my-fullY);
-          if (d2 < best.dist){ best = { dist:d2, a:{x:nx,y:ny}, b:{x:nx,y:ny+1} }; }
+          if (d2 < best.d2){ best.d2 = d2; best.ax = nx; best.ay = ny; best.bx = nx; best.by = ny+1; }
         }
       }
     }
@@ -332,6 +819,7 @@ html_code = r"""
   let pointerStart = null;
   let isDragging = false;
   const DRAG_THRESHOLD = 6;
+  const DRAG_THRESHOLD_SQ = DRAG_THRESHOLD * DRAG_THRESHOLD;
 
   canvas.addEventListener('pointerdown', (ev) => {
     canvas.setPointerCapture(ev.pointerId);
@@ -342,16 +830,22 @@ html_code = r"""
 
   window.addEventListener('pointermove', (ev) => {
     if (!isPointerDown || !pointerStart) return;
-    const dx = ev.clientX - pointerStart.x;
-    const dy = ev.clientY - pointerStart.y;
-    if (!isDragging && Math.hypot(dx,dy) > DRAG_THRESHOLD) isDragging = true;
+    // panning only needs the newest sample of a coalesced batch; intermediates are dropped
+    let last = ev;
+    if (typeof ev.getCoalescedEvents === 'function'){
+      const batch = ev.getCoalescedEvents();
+      if (batch.length) last = batch[batch.length - 1];
+    }
+    const dx = last.clientX - pointerStart.x;
+    const dy = last.clientY - pointerStart.y;
+    if (!isDragging && dx*dx + dy*dy > DRAG_THRESHOLD_SQ) isDragging = true;
     if (isDragging){
-      const fx = -dx * (viewport.w / canvas.width);
-      const fy = -dy * (viewport.h / canvas.height);
+      const fx = -dx * (viewport.w / viewW);
+      const fy = -dy * (viewport.h / viewH);
       viewport.cx = Math.max(viewport.w/2, Math.min(fullWidth - viewport.w/2, pointerStart.cx + fx));
       viewport.cy = Math.max(viewport.h/2, Math.min(fullHeight - viewport.h/2, pointerStart.cy + fy));
-      draw();
-      scheduleSaveState(300);
+      requestDraw();
+      scheduleSaveState(800, { edges: false });
     }
   });
 
@@ -359,22 +853,28 @@ html_code = r"""
     canvas.releasePointerCapture(ev.pointerId);
     if (!isPointerDown) return;
     isPointerDown = false;
+    if (isDragging){
+      // settle the dots layer back to an untranslated raster
+      dotsView.zoom = null;
+      requestDraw();
+      saveStateToURL({ force: true });
+    }
     const dx = ev.clientX - pointerStart.x;
     const dy = ev.clientY - pointerStart.y;
-    if (!isDragging && Math.hypot(dx,dy) <= DRAG_THRESHOLD){
+    if (!isDragging && dx*dx + dy*dy <= DRAG_THRESHOLD_SQ){
       const rect = canvas.getBoundingClientRect();
       const sx = ev.clientX - rect.left;
       const sy = ev.clientY - rect.top;
       const full = screenToFull(sx, sy);
       const nearest = findNearestEdgeToFull(full.x, full.y);
-      if (nearest && nearest.dist !== Infinity){
-        // map world distance to approx screen pixels: d_screen ≈ sqrt(dist) * (canvas.width / viewport.w)
-        const distScreen = Math.sqrt(nearest.dist) * (canvas.width / viewport.w);
-        if (distScreen <= EDGE_HIT_RADIUS){
-          const k = edgeKey(nearest.a, nearest.b);
-          if (edges.has(k)) { removeEdge(nearest.a, nearest.b); }
-          else { addEdge(nearest.a, nearest.b); }
-          draw();
+      if (nearest.d2 !== Infinity){
+        // compare in squared screen pixels: d_screen² ≈ d2 * (viewW / viewport.w)²
+        const s = viewW / viewport.w;
+        if (nearest.d2 * s*s <= EDGE_HIT_RADIUS*EDGE_HIT_RADIUS){
+          const { ax, ay, bx, by } = nearest;
+          if (edges.has(ek(ax,ay,bx,by))) { removeEdge(ax,ay,bx,by); }
+          else { addEdge(ax,ay,bx,by); }
+          requestDraw();
         }
       }
     }
@@ -384,15 +884,10 @@ html_code = r"""
 
   // Bookmark handling: builds a full URL including #state=token,
   // tries to set top-level location (same-origin), otherwise copies to clipboard.
-  async function buildFullBookmarkURL(){
-    const edgesArr = [];
-    edges.forEach((_, k) => {
-      const [a,b] = k.split("|");
-      const aa = a.split(",").map(Number), bb = b.split(",").map(Number);
-      edgesArr.push([aa[0], aa[1], bb[0], bb[1]]);
-    });
-    const stateObj = { edges: edgesArr, viewport: { cx: viewport.cx, cy: viewport.cy, zoom: zoom } };
-    const token = encodeStateToString(stateObj);
+  // Encoded synchronously: awaiting the worker would lose the click's user activation,
+  // which the clipboard write below still needs (Safari)
+  function buildFullBookmarkURL(){
+    const token = encodeStateSync();
     if (!token) return null;
     const fullUrl = window.location.origin + window.location.pathname + window.location.search + '#state=' + token;
     return fullUrl;
@@ -411,9 +906,9 @@ html_code = r"""
         ta.style.left = '-9999px';
         document.body.appendChild(ta);
         ta.select();
-        document.execCommand('copy');
+        const copied = document.execCommand('copy');
         document.body.removeChild(ta);
-        return true;
+        return copied;
       } catch(err) {
         return false;
       }
@@ -421,7 +916,7 @@ html_code = r"""
   }
 
   bookmarkBtn.addEventListener('click', async () => {
-    const url = await buildFullBookmarkURL();
+    const url = buildFullBookmarkURL();
     if (!url) { alert('Unable to build bookmark URL.'); return; }
 
     // Try to update top-level location if same-origin or not in an iframe.
@@ -454,8 +949,8 @@ html_code = r"""
   // Initialize: resize, set top-left alignment, then try to restore state and write iframe-level state
   function initialize(){
     resizeCanvas();
-    viewport.w = canvas.width / zoom;
-    viewport.h = canvas.height / zoom;
+    viewport.w = viewW / zoom;
+    viewport.h = viewH / zoom;
     viewport.cx = viewport.w/2; // left/top aligned to puzzle top-left
     viewport.cy = viewport.h/2;
 
@@ -472,12 +967,18 @@ html_code = r"""
   // Window resize handling
   window.addEventListener('resize', () => {
     resizeCanvas();
-    viewport.w = canvas.width / zoom;
-    viewport.h = canvas.height / zoom;
+    viewport.w = viewW / zoom;
+    viewport.h = viewH / zoom;
     viewport.cx = Math.max(viewport.w/2, Math.min(fullWidth - viewport.w/2, viewport.cx || viewport.w/2));
     viewport.cy = Math.max(viewport.h/2, Math.min(fullHeight - viewport.h/2, viewport.cy || viewport.h/2));
-    draw();
+    requestDraw();
+  });
+
+  // Don't lose a throttled save when the page goes away
+  document.addEventListener('visibilitychange', () => {
+    if (document.visibilityState === 'hidden') saveStateToURL({ force: true, sync: true });
   });
+  window.addEventListener('beforeunload', () => saveStateToURL({ force: true, sync: true }));
 
   // Keyboard helpers (zoom/pan) — update iframe fragment when changed
   window.addEventListener('keydown', (ev) => {
@@ -487,9 +988,9 @@ html_code = r"""
     if (ev.key === 'ArrowRight'){ viewport.cx = Math.min(fullWidth - viewport.w/2, viewport.cx + step); changed = true; }
     if (ev.key === 'ArrowUp')   { viewport.cy = Math.max(viewport.h/2, viewport.cy - step); changed = true; }
     if (ev.key === 'ArrowDown') { viewport.cy = Math.min(fullHeight - viewport.h/2, viewport.cy + step); changed = true; }
-    if (ev.key === '+' || ev.key === '=') { zoom = Math.min(8, zoom * 1.2); viewport.w = canvas.width/zoom; viewport.h = canvas.height/zoom; changed = true; }
-    if (ev.key === '-' || ev.key === '_') { zoom = Math.max(0.6, zoom / 1.2); viewport.w = canvas.width/zoom; viewport.h = canvas.height/zoom; changed = true; }
-    if (changed) { draw(); scheduleSaveState(); }
+    if (ev.key === '+' || ev.key === '=') { zoom = Math.min(MAX_ZOOM, zoom * 1.2); viewport.w = viewW/zoom; viewport.h = viewH/zoom; changed = true; }
+    if (ev.key === '-' || ev.key === '_') { zoom = Math.max(MIN_ZOOM, zoom / 1.2); viewport.w = viewW/zoom; viewport.h = viewH/zoom; changed = true; }
+    if (changed) { requestDraw(); scheduleSaveState(800, { edges: false }); }
   });
 
   // initialize and draw
@@ -499,14 +1000,10 @@ html_code = r"""
   window.slither = {
     exportState: () => {
       const arr = [];
-      edges.forEach((_, k) => {
-        const [a,b] = k.split("|");
-        const aa = a.split(",").map(Number), bb = b.split(",").map(Number);
-        arr.push([aa[0], aa[1], bb[0], bb[1]]);
-      });
+      for (let i = 0; i < eCount; i++) arr.push(slotGrid(i));
       return { edges: arr, viewport: { cx: viewport.cx, cy: viewport.cy, zoom: zoom } };
     },
-    importState: (obj) => { applyState(obj); draw(); scheduleSaveState(); }
+    importState: (obj) => { applyState(obj); requestDraw(); scheduleSaveState(); }
   };
 
 })();